@@ -0,0 +1,40 @@
+"""Library API of declexporter. Declarations are extracted in the current process
+   without reading or writing project files, e.g.:
+
+    context = ParserContext()
+    for declaration in iter_declarations({'src/main.c': ['-Iinclude']}, project_dir, context):
+        print(declaration.kind, declaration.name, declaration.location)
+"""
+import os
+
+from context import Declaration, Location, ParserContext
+
+__all__ = [
+    'Declaration',
+    'Location',
+    'ParserContext',
+    'iter_declarations',
+]
+
+
+def iter_declarations(file_to_args, project_dir=None, context=None):
+    """Yields declarations of files. Files are parsed one by one as the iterator is consumed
+
+    Args:
+        file_to_args (dict of str:list): a map of filenames to such compile arguments as
+            -I (include) and -D (defines)
+        project_dir (str): a directory which relative filenames are resolved against
+            (None - the current directory)
+        context (ParserContext): a context of parsing that can be reused between calls
+            (None - a new context is created)
+
+    Yields:
+        (Declaration): a found declaration
+    """
+    if context is None:
+        context = ParserContext()
+
+    for filename, args in file_to_args.items():
+        filepath = os.path.join(project_dir or os.getcwd(), filename)
+        for declaration in context.parse(filepath, context.make_args(filename, args)):
+            yield declaration
@@ -1,7 +1,9 @@
 from args_generators.makefile_args_generator import MakefileArgsGenerator
 from args_generators.simple_args_generator import SimpleArgsGenerator
+from args_generators.utils import path_matches
 
 __all__ = [
     'MakefileArgsGenerator',
-    'SimpleArgsGenerator'
+    'SimpleArgsGenerator',
+    'path_matches'
 ]
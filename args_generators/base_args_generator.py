@@ -11,11 +11,14 @@ class BaseArgsGenerator:
         project_path (str): an absolute path to project files
         project_pigaios_dir_path (str): an absolute path to directory where can be found results
             of pigaios working process
+        file_to_args (dict of str:list): a map of filenames to arguments, it is set when iter_generate
+            is exhausted
     """
     __metaclass__ = ABCMeta
 
     def __init__(self, project_path):
         self.project_path = os.path.abspath(project_path)
+        self.file_to_args = None
         
         self.project_pigaios_dir_path = os.path.join(self.project_path, PROJECT_PIGAIOS_DIR)
         if not os.path.exists(self.project_pigaios_dir_path):
@@ -30,3 +33,15 @@ class BaseArgsGenerator:
                 -I (include) and -D (defines)
         """
         pass
+
+    def iter_generate(self):
+        """Yields files with their arguments as soon as they are known. By default files are yielded
+           after generate() is finished. When the generator is exhausted, class attribute "file_to_args"
+           is set to the same map as generate() returns
+
+        Yields:
+            (tuple): filename and list of its arguments
+        """
+        self.file_to_args = self.generate()
+        for filename, args in self.file_to_args.items():
+            yield filename, args
@@ -2,8 +2,8 @@ import os
 import re
 import networkx as nx
 from collections import OrderedDict
-from args_generators.utils import is_source_file, path_endswith
-from args_generators.base_args_generator import BaseArgsGenerator
+from args_generators.utils import is_source_file, is_subpath, path_endswith
+from args_generators.base_args_generator import BaseArgsGenerator, PROJECT_PIGAIOS_DIR
 
 
 class SimpleArgsGenerator(BaseArgsGenerator):
@@ -32,6 +32,99 @@ class SimpleArgsGenerator(BaseArgsGenerator):
         file_to_args = OrderedDict(sorted(file_to_args.items(), key=lambda x: x[0]))
         return file_to_args
 
+    def iter_generate(self):
+        """Yields files with their arguments while the project is still being discovered
+
+           A source file (.c, .cpp) is yielded as soon as all project headers that it includes (directly
+           or not) are scanned. Its arguments are include directories found so far, in the same order as
+           generate() finds them, so they are the final arguments unless more directories are found later.
+           When discovery is finished, the remaining files without parent are yielded with the same arguments
+           as generate() returns. Source files that turn out to be included by other files are yielded too,
+           they are not found in "file_to_args".
+
+        Yields:
+            (tuple): filename and list of its arguments
+        """
+        print('[+] Retrieving project headers...')
+        pide = ProjectIncludeDirsExtractor(self.project_path)
+        project_files = pide.get_project_files()
+
+        resolved = {}
+
+        def resolve(include):
+            if include not in resolved:
+                filepath, include_dir = pide.resolve_include(include, project_files)
+                if filepath:
+                    filepath = os.path.relpath(filepath, self.project_path)
+                resolved[include] = filepath, include_dir
+            return resolved[include]
+
+        print('[+] Streaming files with their includes...')
+        pie = ProjectIncludesExtractor(self.project_path)
+        files_to_includes = {}
+        include_dirs = []
+        waiting = {}
+        yielded = set()
+        for filename, includes in pie.iter_files_to_includes():
+            files_to_includes[filename] = includes
+            for include in includes:
+                header, include_dir = resolve(include)
+                if header and include_dir not in include_dirs:
+                    include_dirs.append(include_dir)
+
+            candidates = waiting.pop(filename, [])
+            if filename.endswith('.c') or filename.endswith('.cpp'):
+                candidates.append(filename)
+
+            for candidate in candidates:
+                missing = self._get_unscanned_include(candidate, files_to_includes, resolve)
+                if missing:
+                    waiting.setdefault(missing, []).append(candidate)
+                    continue
+
+                yielded.add(candidate)
+                yield candidate, ['-I{}'.format(pi) for pi in include_dirs]
+
+        print('[+] Retrieving files without parent...')
+        files_without_parent = self._get_files_without_parent(files_to_includes)
+
+        file_to_args = {}
+        for f in files_without_parent:
+            file_to_args[f] = ['-I{}'.format(pi) for pi in include_dirs]
+
+        self.file_to_args = OrderedDict(sorted(file_to_args.items(), key=lambda x: x[0]))
+        for filename, args in self.file_to_args.items():
+            if filename not in yielded:
+                yield filename, args
+
+    @staticmethod
+    def _get_unscanned_include(filename, files_to_includes, resolve):
+        """Gets a project header that is included by the file (directly or not) and is not scanned yet
+
+        Args:
+            filename (str): a relative path of the scanned file
+            files_to_includes (dict of str:list): scanned files with their included files
+            resolve (callable): function include -> (relative path of header, include dir)
+
+        Returns:
+            (str): the first included header that is not scanned yet (None if all are scanned)
+        """
+        visited = {filename}
+        stack = [filename]
+        while stack:
+            for include in files_to_includes[stack.pop()]:
+                header, _ = resolve(include)
+                if not header or header in visited:
+                    continue
+
+                if header not in files_to_includes:
+                    return header
+
+                visited.add(header)
+                stack.append(header)
+
+        return None
+
     @staticmethod
     def _get_files_without_parent(files_to_includes):
         """Gets files that are not found in #iclude statements
@@ -67,21 +160,29 @@ class ProjectIncludesExtractor:
             files_to_includes (dict of str:list): files with their included files
         """
     
-        files_to_includes = {}
+        return dict(self.iter_files_to_includes())
+
+    def iter_files_to_includes(self):
+        """Yields files with their included files as soon as the file is scanned
+
+        Yields:
+            (tuple): relative path of a file and list of its included files
+        """
+
+        pigaios_dir = os.path.join(self.project_path, PROJECT_PIGAIOS_DIR)
         for root, _, files in os.walk(self.project_path, topdown=False):
+            if is_subpath(root, pigaios_dir):
+                continue
+
             for name in files:
                 if is_source_file(name):
                     filepath = os.path.abspath(os.path.join(root, name))
                     relpath = os.path.relpath(filepath, self.project_path)
-    
-                    result = self._extract_includes(filepath)
-                    if result:
-                        files_to_includes[relpath] = result
-                    else:
-                        files_to_includes[relpath] = []
-        return files_to_includes
 
-    def _extract_includes(self, filepath):
+                    result = self.extract_includes(filepath)
+                    yield relpath, result or []
+
+    def extract_includes(self, filepath):
         """Extracts included files from header file
         
         Args:
@@ -141,11 +242,12 @@ class ProjectIncludeDirsExtractor:
     def __init__(self, project_path):
         self.project_path = project_path
 
-    def get_project_include_dirs(self, files_to_includes):
+    def get_project_include_dirs(self, files_to_includes, project_files=None):
         """Gets includes with directories where they can be found
     
         Args:
             files_to_includes (dict of str:list): files with their included files
+            project_files (list of str): list of project headers (if None then they are retrieved)
             
         Returns:
             include_dirs (list of str): paths of include directories where
@@ -153,17 +255,18 @@ class ProjectIncludeDirsExtractor:
         """
     
         includes = self._extract_includes(files_to_includes)
-        include_dirs = self._traverse_dirs(includes)
+        include_dirs = self._traverse_dirs(includes, project_files)
     
         return include_dirs
 
-    def _traverse_dirs(self, includes):
+    def _traverse_dirs(self, includes, project_files=None):
         """Traverses project directories to find directories where
             includes can be found
     
         Args:
             includes (list of str): list of includes which can be found in
                 project files in #include statements
+            project_files (list of str): list of project headers (if None then they are retrieved)
     
         Returns:
             include_dirs (list of str): paths of include directories where
@@ -173,17 +276,36 @@ class ProjectIncludeDirsExtractor:
     
         include_dirs = []
         
-        project_files = self._get_project_files()
+        if project_files is None:
+            project_files = self.get_project_files()
         
         for include in includes:
-            filepath = self._find_in_project_dir(include, project_files)
+            filepath, include_dir = self.resolve_include(include, project_files)
             if filepath:
-                include_dir = filepath[:filepath.find(include)-1]
                 if include_dir not in include_dirs:
                     include_dirs.append(include_dir)
 
         return include_dirs
 
+    @staticmethod
+    def resolve_include(include, project_files):
+        """Resolves include to a project file and directory where it can be found
+
+        Args:
+            include (str): search include
+            project_files (list of str): list of files used to search for a include
+
+        Returns:
+            (tuple): path of a file that matches include and its include directory
+                (None, None) if include is not found
+        """
+
+        filepath = ProjectIncludeDirsExtractor._find_in_project_dir(include, project_files)
+        if not filepath:
+            return None, None
+
+        return filepath, filepath[:filepath.find(include)-1]
+
     @staticmethod
     def _find_in_project_dir(include, project_files):
         """Search project files for include. If not found returns None
@@ -200,8 +322,8 @@ class ProjectIncludeDirsExtractor:
             if path_endswith(pf, include):
                 return pf
 
-    def _get_project_files(self):
-        """Gets project files (only source and headers)
+    def get_project_files(self):
+        """Gets project files (only headers), files of declexporter directory are skipped
     
         Args:
     
@@ -210,7 +332,11 @@ class ProjectIncludeDirsExtractor:
         """
     
         project_files = []
+        pigaios_dir = os.path.join(self.project_path, PROJECT_PIGAIOS_DIR)
         for root, _, files in os.walk(self.project_path, topdown=False):
+            if is_subpath(root, pigaios_dir):
+                continue
+
             for name in files:
                 filepath = os.path.abspath(os.path.join(root, name))
                 if filepath.endswith('.h') or filepath.endswith('.hpp'):
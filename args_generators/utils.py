@@ -1,4 +1,5 @@
 import os
+from fnmatch import fnmatch
 
 
 def is_source_file(filename):
@@ -15,6 +16,43 @@ def is_source_file(filename):
         or filename.endswith('.c') or filename.endswith('.cpp')
 
 
+def is_subpath(path, directory):
+    """Checks if the path is the directory or is located in it
+
+    Args:
+        path (str): checked path
+        directory (str): a path of directory
+
+    Returns:
+        (bool): is path located in directory
+    """
+
+    path = os.path.abspath(path)
+    directory = os.path.abspath(directory)
+    return path == directory or path.startswith(directory + os.sep)
+
+
+def path_matches(path, only=None, exclude=None):
+    """Checks if the path is selected by glob patterns
+
+    Args:
+        path (str): a path relative to project directory
+        only (list of str): the path must match one of these patterns (None - any path)
+        exclude (list of str): the path must not match any of these patterns (None - no path is excluded)
+
+    Returns:
+        (bool): is path selected
+    """
+    path = path.replace('\\', '/')
+    if only and not any(fnmatch(path, pattern) for pattern in only):
+        return False
+
+    if exclude and any(fnmatch(path, pattern) for pattern in exclude):
+        return False
+
+    return True
+
+
 def path_endswith(path, trailer):
     """Checks if path has a trailer file
 
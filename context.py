@@ -0,0 +1,117 @@
+from collections import namedtuple
+
+import clang.cindex
+from clang.cindex import CursorKind
+
+from parser import Parser
+
+DEFAULT_CFLAGS = '-xc'
+DEFAULT_CXXFLAGS = '-xc++'
+
+Declaration = namedtuple('Declaration', ['kind', 'name', 'source', 'location', 'refs'])
+Declaration.__doc__ = """An extracted declaration
+
+Attributes:
+    kind (str): kind of declaration (struct, union, enum or typedef)
+    name (str): name of declaration
+    source (str): source code of declaration
+    location (Location): location of declaration
+    refs (tuple of tuple): kinds and names of types that are referenced by declaration
+"""
+
+Location = namedtuple('Location', ['file', 'line', 'column'])
+Location.__doc__ = """Location of a declaration
+
+Attributes:
+    file (str): a path of the file where declaration is found (None for built-in declarations)
+    line (int): line number
+    column (int): column number
+"""
+
+
+class ParserContext:
+    """Reusable context of parsing. The clang index is created once on first parsing,
+       so one process can parse many files without recreating it
+
+    Attributes:
+        cflags (str): arguments which are added for C files
+        cxxflags (str): arguments which are added for C++ files
+    """
+    def __init__(self, cflags=DEFAULT_CFLAGS, cxxflags=DEFAULT_CXXFLAGS):
+        self.cflags = cflags
+        self.cxxflags = cxxflags
+        self._index = None
+
+    def make_args(self, filename, args):
+        """Makes arguments for clang parsing of the file
+
+        Args:
+            filename (str): a path of the file
+            args (list of str): arguments of the file, such as -I (include) and -D (defines)
+
+        Returns:
+            (list of str): arguments with language flags
+        """
+        if filename.endswith('.c') or filename.endswith('.h'):
+            return args + self.cflags.split()
+        else:
+            return args + self.cxxflags.split()
+
+    def parse(self, filename, args):
+        """Parses the file with arguments
+
+        Args:
+            filename (str): an absolute path of the file
+            args (list of str): arguments for clang parsing
+
+        Returns:
+            declarations (list of Declaration): declarations found in the file
+        """
+        if self._index is None:
+            self._index = clang.cindex.Index.create()
+
+        tu = self._index.parse(filename, args=args)
+        return list(self.iter_declarations(tu.cursor))
+
+    @staticmethod
+    def iter_declarations(cursor):
+        """Yields declarations found in children of the cursor
+
+        Args:
+            cursor (clang.cindex.Cursor): a parsed translation unit
+
+        Yields:
+            (Declaration): a found declaration
+        """
+        for element in cursor.get_children():
+            if element.kind == CursorKind.STRUCT_DECL:
+                kind, declaration = 'struct', Parser.parse_struct(element)
+            elif element.kind == CursorKind.UNION_DECL:
+                kind, declaration = 'union', Parser.parse_union(element)
+            elif element.kind == CursorKind.ENUM_DECL:
+                kind, declaration = 'enum', Parser.parse_enum(element)
+            elif element.kind == CursorKind.TYPEDEF_DECL:
+                kind, declaration = 'typedef', Parser.parse_typedef(element)
+            else:
+                continue
+
+            if not declaration:
+                continue
+
+            name, src = declaration
+            location = ParserContext._get_location(element)
+            yield Declaration(kind, name, src, location, tuple(Parser.get_type_refs(element)))
+
+    @staticmethod
+    def _get_location(element):
+        """Gets location of the cursor
+
+        Args:
+            element (clang.cindex.Cursor): a parsed declaration
+
+        Returns:
+            (Location): location of the declaration
+        """
+        location = element.location
+        filename = location.file.name if location.file else None
+        return Location(filename, location.line, location.column)
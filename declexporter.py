@@ -3,6 +3,8 @@ import argparse
 
 from project_creator import ProjectCreator
 from exporter import Exporter
+from pipeline import Pipeline
+from scheduler import TUScheduler, DEFAULT_TU_TIMEOUT, DEFAULT_TUS_PER_WORKER
 
 
 if __name__ == '__main__':
@@ -11,15 +13,51 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument('-export', help='Export definitions into common header file', action='store_true')
     parser.add_argument('-create', help='Create a project file', action='store_true')
+    parser.add_argument('-pipeline', help='Create a project file and export definitions at once, '
+                                          'files are parsed while the project is still being discovered',
+                        action='store_true')
     parser.add_argument('--build-system', help='Build system that is used for project', dest='build_system',
                         default=None)
     parser.add_argument('--project-dir', help='A project directory for analysis', dest='project_dir',
                         default=default_project_dir)
+    parser.add_argument('--jobs', help='Number of worker processes for parsing', dest='jobs', type=int,
+                        default=None)
+    parser.add_argument('--tu-timeout', help='Wall-clock timeout in seconds for parsing of a single file',
+                        dest='tu_timeout', type=float, default=DEFAULT_TU_TIMEOUT)
+    parser.add_argument('--tu-max-rss', help='Memory cap in MB for parsing of a single file', dest='tu_max_rss',
+                        type=int, default=None)
+    parser.add_argument('--tus-per-worker', help='Number of files after which a worker process is restarted',
+                        dest='tus_per_worker', type=int, default=DEFAULT_TUS_PER_WORKER)
+    parser.add_argument('--roots', help='Comma-separated names of root types, only the root types and the types '
+                                        'they depend on are exported', dest='roots', default=None)
+    parser.add_argument('--only', help='Glob pattern of files (relative to project directory) which are processed, '
+                                       'can be repeated', dest='only', action='append', default=None)
+    parser.add_argument('--exclude', help='Glob pattern of files (relative to project directory) which are skipped, '
+                                          'can be repeated', dest='exclude', action='append', default=None)
+    parser.add_argument('--delta', help='Write declarations added, changed and removed since the previous export',
+                        dest='delta', action='store_true')
+    parser.add_argument('--split', help='Write one header per source directory and an umbrella header which '
+                                        'includes them', dest='split', action='store_true')
     args = parser.parse_args()
 
-    if args.create:
-        pc = ProjectCreator(args.project_dir, args.build_system)
+    if args.pipeline and args.roots:
+        parser.error('--roots can not be used with -pipeline, use -create and then -export --roots')
+    if args.delta and (args.roots or args.only or args.exclude):
+        parser.error('--delta can not be used with --roots, --only and --exclude, '
+                     'deltas are computed between exports of the whole project')
+
+    max_rss = args.tu_max_rss << 20 if args.tu_max_rss else None
+    scheduler = TUScheduler(jobs=args.jobs, timeout=args.tu_timeout, max_rss=max_rss,
+                            tus_per_worker=args.tus_per_worker)
+
+    if args.pipeline:
+        pipeline = Pipeline(args.project_dir, args.build_system, scheduler, args.only, args.exclude, args.delta,
+                            args.split)
+        pipeline.run()
+    elif args.create:
+        pc = ProjectCreator(args.project_dir, args.build_system, args.only, args.exclude)
         pc.create_project_file()
     elif args.export:
-        exporter = Exporter(args.project_dir)
-        exporter.export()
+        exporter = Exporter(args.project_dir, scheduler, only=args.only, exclude=args.exclude, delta=args.delta,
+                            split=args.split)
+        exporter.export(args.roots.split(',') if args.roots else None)
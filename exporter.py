@@ -1,9 +1,13 @@
 import json
 import os
-import clang.cindex
-from clang.cindex import CursorKind
 
-from parser import Parser
+from args_generators import path_matches
+from context import ParserContext
+from fingerprints import make_fingerprints, make_file_keys, load_fingerprints, save_fingerprints, keep_skipped, \
+    make_delta
+from header_writer import ShardWriter, mark_redefinitions, format_declarations
+from reachability import TypeIndex, SourceScanner
+from scheduler import TUScheduler
 
 PROJECT_PIGAIOS_DIR = '__declexporter__'
 
@@ -13,88 +17,215 @@ class Exporter:
 
     Attributes:
         project_dir (str): a path to directory with source files
-        declarations (list): declarations that are exported eventually
+        declarations (list of Declaration): declarations that are exported eventually
+        skipped (dict of str:str): files that were not parsed with the reason of skipping
+        file_keys (dict of str:list): keys of exported declarations for each parsed file
+        roots (list of str): names of root types of the export (None - all types are exported)
         config (dict): project configuration of declexporter
+        context (ParserContext): a context of parsing with flags from the project configuration
+        scheduler (TUScheduler): a scheduler which parses files in worker processes (if the scheduler
+            has no parse function, the context is used)
+        only (list of str): glob patterns of files and declaration locations which are exported (None - any)
+        exclude (list of str): glob patterns of files and declaration locations which are not exported
+        delta (bool): write added, changed and removed declarations since the previous export. Only exports
+            of the whole project update the fingerprints of the previous export, so delta can't be used
+            with "only", "exclude" and "roots"
+        split (bool): write one header per source directory and an umbrella header which includes them
     """
-    def __init__(self, project_dir):
-        self.project_dir = project_dir
+    def __init__(self, project_dir, scheduler=None, config=None, only=None, exclude=None, delta=False,
+                 split=False):
+        self.project_dir = os.path.abspath(project_dir)
+        self.only = only
+        self.exclude = exclude
+        self.delta = delta
+        self.split = split
         self.declarations = []
+        self.skipped = {}
+        self.file_keys = {}
+        self.roots = None
 
-        config_file = os.path.join(project_dir, PROJECT_PIGAIOS_DIR, 'project.json')
-        with open(config_file) as f:
-            self.config = json.load(f)
+        if delta and (only or exclude):
+            raise ValueError('delta can not be used with "only" and "exclude" patterns')
 
-    def export(self):
+        if config is None:
+            config_file = os.path.join(self.project_dir, PROJECT_PIGAIOS_DIR, 'project.json')
+            with open(config_file) as f:
+                config = json.load(f)
+        self.config = config
+        self.context = ParserContext(config['PROJECT']['cflags'], config['PROJECT']['cxxflags'])
+
+        self.scheduler = scheduler or TUScheduler()
+        if self.scheduler.parse_func is None:
+            self.scheduler.parse_func = self.context.parse
+
+    def export(self, roots=None):
         """Extracts declarations from each file and write them to the export-header file
+
+        Args:
+            roots (list of str): names of root types, if they are set only the root types and
+                the types they depend on are exported
         """
+        if self.delta and roots:
+            raise ValueError('delta can not be used with root types')
+        self.roots = roots
+
         files = self.config['FILES']
 
-        for filename, args in files.items():
-            filepath = os.path.join(self.project_dir, filename)
+        tus = [self.make_tu(filename, args) for filename, args in files.items() if self.is_selected(filename)]
+        if roots:
+            results, skipped, reachable = self._parse_reachable(tus, roots)
+        else:
+            results, skipped = self.scheduler.run(tus)
 
-            if filename.endswith('.c') or filename.endswith('.h'):
-                args_plus = args.extend(self.config['PROJECT']['cflags'])
-            else:
-                args_plus = args.extend(self.config['PROJECT']['cxxflags'])
+        self.collect(results, skipped)
+        if roots:
+            self.declarations = [d for d in self.declarations if (d.kind, d.name) in reachable]
+            self.file_keys = {}
+        self.write_header()
+        self.write_fingerprints()
 
-            self.parse(filepath, args_plus)
+    def _parse_reachable(self, tus, roots):
+        """Parses only files that can declare types reachable from the root types.
+           A file is parsed if it or its included project headers mention a reachable type
+           which is not declared yet. Files are parsed in rounds until all reachable types are declared
 
-        header_file = os.path.join(self.project_dir, self.config['PROJECT']['export-header'])
-        with open(header_file, 'w') as f:
-            dones = set()
-            for def_type, def_name, def_src in self.declarations:
-                item = str([def_type, def_name])
-                is_redef = item in dones and def_type == "struct"
-                if is_redef:
-                    f.write("\n/** Redefined\n")
+        Args:
+            tus (list of tuple): translation units made by make_tu
+            roots (list of str): names of root types
 
-                pos = def_src.find("\n")
-                if pos > -1:
-                    f.write("\n")
+        Returns:
+            (tuple): a map of filenames to their declarations, a map of skipped filenames to the reason
+                of skipping and kinds and names of reachable types
+        """
+        index = TypeIndex()
+        scanner = SourceScanner(self.project_dir)
+        results = {}
+        skipped = {}
+        remaining = list(tus)
+        wanted = set(roots)
+
+        while wanted and remaining:
+            selected = [tu for tu in remaining if scanner.mentions(tu[1], tu[2], wanted)]
+            if not selected:
+                # Root types may come from headers outside of the project
+                if not index.missing_roots(roots):
+                    break
+                selected = remaining
+
+            selected_files = {tu[0] for tu in selected}
+            remaining = [tu for tu in remaining if tu[0] not in selected_files]
+            round_results, round_skipped = self.scheduler.run(selected)
+            results.update(round_results)
+            skipped.update(round_skipped)
+
+            for declarations in round_results.values():
+                for declaration in declarations:
+                    index.add(declaration)
+
+            missing = index.missing(index.closure(roots))
+            wanted = {name for _, name in missing} | index.missing_roots(roots)
+
+        missing_roots = index.missing_roots(roots)
+        if missing_roots:
+            print('[!] Root types are not found: {}'.format(', '.join(sorted(missing_roots))))
+
+        return results, skipped, index.closure(roots)
+
+    def make_tu(self, filename, args):
+        """Makes a translation unit to be parsed by the scheduler
 
-                f.write("%s\n" % def_src)
-                if pos > -1:
-                    f.write("\n")
+        Args:
+            filename (str): a filename from the project file
+            args (list of str): arguments of the file from the project file
+
+        Returns:
+            (tuple): filename, an absolute path of the file and arguments for clang parsing
+        """
+        filepath = os.path.join(self.project_dir, filename)
 
-                if is_redef:
-                    f.write("*/\n\n")
+        args_plus = self.context.make_args(filename, args)
 
-                dones.add(item)
+        return filename, filepath, args_plus
 
-    def parse(self, filename, args):
-        """Parses the file with arguments
+    def is_selected(self, path):
+        """Checks if the file or the declaration location is selected by "only" and "exclude" patterns
 
         Args:
-            filename (str): an absolute path of the file
-            args (str): arguments for clang parsing
+            path (str): a path of the file (absolute or relative to project directory)
+
+        Returns:
+            (bool): is path selected
         """
-        index = clang.cindex.Index.create()
-        tu = index.parse(filename, args=args)
-        for element in tu.cursor.get_children():
-            if element.kind == CursorKind.STRUCT_DECL:
-                struct = Parser.parse_struct(element)
-
-                if not struct:
-                    continue
-
-                struct_name, struct_src = struct
-                self.declarations.append(["struct", struct_name, struct_src])
-            elif element.kind == CursorKind.UNION_DECL:
-                union = Parser.parse_union(element)
-
-                if not union:
-                    continue
-
-                union_name, union_src = union
-                self.declarations.append(["union", union_name, union_src])
-            elif element.kind == CursorKind.ENUM_DECL:
-                enum_name, enum_src = Parser.parse_enum(element)
-                self.declarations.append(["enum", enum_name, enum_src])
-            elif element.kind == CursorKind.TYPEDEF_DECL:
-                typedef = Parser.parse_typedef(element)
-
-                if not typedef:
-                    continue
-
-                typedef_name, typedef_src = typedef
-                self.declarations.append(["typedef", typedef_name, typedef_src])
+        if not self.only and not self.exclude:
+            return True
+
+        if path is None:
+            return not self.only
+
+        relpath = os.path.relpath(os.path.join(self.project_dir, path), self.project_dir)
+        return path_matches(relpath, self.only, self.exclude)
+
+    def collect(self, results, skipped):
+        """Collects declarations of the project files in order of the project file
+
+        Args:
+            results (dict of str:list): a map of filenames to their declarations (list of Declaration)
+            skipped (dict of str:str): a map of skipped filenames to the reason of skipping
+        """
+        files = self.config['FILES']
+
+        file_to_declarations = {}
+        for filename in files:
+            declarations = [d for d in results.get(filename, []) if self.is_selected(d.location.file)]
+            self.declarations.extend(declarations)
+            if filename in results:
+                file_to_declarations[filename] = declarations
+        self.file_keys = make_file_keys(file_to_declarations)
+        self.skipped = {filename: reason for filename, reason in skipped.items() if filename in files}
+
+    def write_header(self):
+        """Writes collected declarations to the export-header file
+        """
+        header_file = os.path.join(self.project_dir, self.config['PROJECT']['export-header'])
+
+        preamble = ''
+        if self.skipped:
+            preamble = "/** Skipped files\n"
+            for filename, reason in sorted(self.skipped.items()):
+                preamble += " * %s: %s\n" % (filename, reason)
+            preamble += "*/\n\n"
+
+        if self.split:
+            sw = ShardWriter(header_file, self.project_dir, self.scheduler.jobs)
+            sw.write(self.declarations, preamble)
+            return
+
+        with open(header_file, 'w') as f:
+            f.write(preamble)
+            f.write(format_declarations(self.declarations, mark_redefinitions(self.declarations)))
+
+    def write_fingerprints(self):
+        """Writes fingerprints of exported declarations next to the export-header file.
+           If delta is requested, writes declarations changed since the previous export.
+           Declarations of skipped files keep fingerprints of the previous export and are not reported
+           as removed. Exports of a part of the project don't update fingerprints
+        """
+        if self.only or self.exclude or self.roots:
+            print('[+] Export of a part of the project, fingerprints are not updated')
+            return
+
+        header_file = os.path.join(self.project_dir, self.config['PROJECT']['export-header'])
+        base_path = os.path.splitext(header_file)[0]
+        fingerprints_file = '%s.fingerprints.json' % base_path
+
+        old_fingerprints, old_file_keys = load_fingerprints(fingerprints_file)
+        fingerprints = make_fingerprints(self.declarations)
+        file_keys = dict(self.file_keys)
+        keep_skipped(old_fingerprints, old_file_keys, fingerprints, file_keys, self.skipped)
+
+        if self.delta:
+            delta = make_delta(self.declarations, old_fingerprints, fingerprints)
+            with open('%s.delta.json' % base_path, 'w') as f:
+                json.dump(delta, f, indent=4)
+
+        save_fingerprints(fingerprints_file, fingerprints, file_keys)
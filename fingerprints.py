@@ -0,0 +1,189 @@
+import hashlib
+import json
+import os
+import re
+from collections import OrderedDict
+
+# libclang names anonymous types by their location, e.g. "enum (unnamed at /path/to/file.h:10:1)"
+ANONYMOUS_PATTERN = re.compile(r'\((?:unnamed|anonymous)[^()]* at [^()]*\)')
+
+
+def fingerprint(declaration):
+    """Computes a stable content fingerprint of a declaration. Locations of anonymous types are not
+       taken into account, so moving a declaration in the file doesn't change its fingerprint
+
+    Args:
+        declaration (Declaration): an extracted declaration
+
+    Returns:
+        (str): hex digest of kind, name and source code of declaration
+    """
+    source = ANONYMOUS_PATTERN.sub('(anonymous)', declaration.source)
+    content = '\n'.join([declaration.kind, declaration_name(declaration), source])
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def declaration_name(declaration):
+    """Gets a name of declaration which doesn't depend on its location. An anonymous declaration
+       is named by names of its members (enumerators), e.g. "{RED, GREEN}"
+
+    Args:
+        declaration (Declaration): an extracted declaration
+
+    Returns:
+        (str): name of declaration
+    """
+    if declaration.name and not ANONYMOUS_PATTERN.search(declaration.name):
+        return declaration.name
+
+    members = []
+    for line in declaration.source.split('\n')[1:-1]:
+        member = line.split('=')[0].strip(' ,;')
+        if member and member not in '{}':
+            members.append(member)
+    return '{%s}' % ', '.join(members)
+
+
+def declaration_key(declaration):
+    """Gets a key which identifies a declaration between exports
+
+    Args:
+        declaration (Declaration): an extracted declaration
+
+    Returns:
+        (str): kind and name of declaration
+    """
+    return '%s %s' % (declaration.kind, declaration_name(declaration))
+
+
+def make_fingerprints(declarations):
+    """Makes fingerprints of declarations. For redefined declarations the first definition is used,
+       because only it is active in the export-header file
+
+    Args:
+        declarations (list of Declaration): exported declarations
+
+    Returns:
+        fingerprints (OrderedDict of str:str): a map of declaration keys to fingerprints
+    """
+    fingerprints = OrderedDict()
+    for declaration in declarations:
+        key = declaration_key(declaration)
+        if key not in fingerprints:
+            fingerprints[key] = fingerprint(declaration)
+    return fingerprints
+
+
+def make_file_keys(file_to_declarations):
+    """Makes a map of files to keys of declarations found in them
+
+    Args:
+        file_to_declarations (dict of str:list): a map of filenames to their exported declarations
+
+    Returns:
+        file_keys (OrderedDict of str:list): a map of filenames to declaration keys
+    """
+    file_keys = OrderedDict()
+    for filename, declarations in file_to_declarations.items():
+        file_keys[filename] = sorted({declaration_key(declaration) for declaration in declarations})
+    return file_keys
+
+
+def load_fingerprints(filepath):
+    """Loads fingerprints of the previous export
+
+    Args:
+        filepath (str): a path of fingerprints file
+
+    Returns:
+        (tuple): a map of declaration keys to fingerprints and a map of filenames to declaration keys
+            (both are empty if there is no previous export)
+    """
+    if not os.path.exists(filepath):
+        return {}, {}
+
+    with open(filepath) as f:
+        data = json.load(f)
+
+    return data['fingerprints'], data['files']
+
+
+def save_fingerprints(filepath, fingerprints, file_keys):
+    """Saves fingerprints of the export
+
+    Args:
+        filepath (str): a path of fingerprints file
+        fingerprints (dict of str:str): a map of declaration keys to fingerprints
+        file_keys (dict of str:list): a map of filenames to declaration keys
+    """
+    data = OrderedDict()
+    data['fingerprints'] = fingerprints
+    data['files'] = file_keys
+
+    with open(filepath, 'w') as f:
+        json.dump(data, f, indent=4)
+
+
+def keep_skipped(old_fingerprints, old_file_keys, fingerprints, file_keys, skipped):
+    """Keeps fingerprints of the previous export for declarations of files that are skipped now.
+       A file skipped due to a timeout or a crash doesn't mean its declarations are removed
+
+    Args:
+        old_fingerprints (dict of str:str): fingerprints of the previous export
+        old_file_keys (dict of str:list): declaration keys of files of the previous export
+        fingerprints (dict of str:str): fingerprints of the current export, kept ones are added to it
+        file_keys (dict of str:list): declaration keys of files of the current export, kept ones are added to it
+        skipped (iterable of str): filenames that are skipped in the current export
+    """
+    for filename in skipped:
+        if filename not in old_file_keys:
+            continue
+
+        file_keys[filename] = old_file_keys[filename]
+        for key in old_file_keys[filename]:
+            if key not in fingerprints and key in old_fingerprints:
+                fingerprints[key] = old_fingerprints[key]
+
+
+def make_delta(declarations, old_fingerprints, new_fingerprints):
+    """Makes a delta between the previous and the current exports
+
+    Args:
+        declarations (list of Declaration): declarations of the current export
+        old_fingerprints (dict of str:str): fingerprints of the previous export
+        new_fingerprints (dict of str:str): fingerprints of the current export
+
+    Returns:
+        delta (OrderedDict): added, changed and removed declarations
+    """
+    added = []
+    changed = []
+    dones = set()
+    for declaration in declarations:
+        key = declaration_key(declaration)
+        if key in dones:
+            continue
+        dones.add(key)
+
+        item = OrderedDict([
+            ('kind', declaration.kind),
+            ('name', declaration_name(declaration)),
+            ('source', declaration.source),
+            ('fingerprint', new_fingerprints[key]),
+        ])
+        if key not in old_fingerprints:
+            added.append(item)
+        elif old_fingerprints[key] != new_fingerprints[key]:
+            changed.append(item)
+
+    removed = []
+    for key, old_fingerprint in old_fingerprints.items():
+        if key not in new_fingerprints:
+            kind, name = key.split(' ', 1)
+            removed.append(OrderedDict([('kind', kind), ('name', name), ('fingerprint', old_fingerprint)]))
+
+    delta = OrderedDict()
+    delta['added'] = added
+    delta['changed'] = changed
+    delta['removed'] = removed
+    return delta
@@ -0,0 +1,235 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import networkx as nx
+
+# Names of real directories starting with "_" are escaped by one more "_", so they never match these names
+ROOT_SHARD = '_root'
+EXTERNAL_SHARD = '_external'
+
+
+def mark_redefinitions(declarations):
+    """Marks structures which are already defined by previous declarations
+
+    Args:
+        declarations (list of Declaration): exported declarations
+
+    Returns:
+        redefs (list of bool): is declaration a redefinition, for each declaration
+    """
+    redefs = []
+    dones = set()
+    for declaration in declarations:
+        item = str([declaration.kind, declaration.name])
+        redefs.append(item in dones and declaration.kind == "struct")
+        dones.add(item)
+    return redefs
+
+
+def format_declarations(declarations, redefs):
+    """Formats declarations as source code of a header, redefinitions are commented
+
+    Args:
+        declarations (list of Declaration): exported declarations
+        redefs (list of bool): is declaration a redefinition, for each declaration
+
+    Returns:
+        (str): source code of declarations
+    """
+    lines = []
+    for declaration, is_redef in zip(declarations, redefs):
+        def_src = declaration.source
+        if is_redef:
+            lines.append("\n/** Redefined\n")
+
+        pos = def_src.find("\n")
+        if pos > -1:
+            lines.append("\n")
+
+        lines.append("%s\n" % def_src)
+        if pos > -1:
+            lines.append("\n")
+
+        if is_redef:
+            lines.append("*/\n\n")
+
+    return ''.join(lines)
+
+
+class ShardWriter:
+    """Writer of declarations into one header per source directory (shard) and an umbrella header
+       which includes shards in dependency order. Shards are written in parallel, a shard is
+       rewritten only if its content is changed
+
+    Attributes:
+        header_file (str): a path of the umbrella header
+        project_dir (str): a path to project directory
+        shards_dir (str): a path of directory with shards
+        jobs (int): number of threads which write shards
+    """
+    def __init__(self, header_file, project_dir, jobs=None):
+        self.header_file = header_file
+        self.project_dir = project_dir
+        self.shards_dir = os.path.splitext(header_file)[0]
+        self.jobs = jobs
+
+    def write(self, declarations, preamble=''):
+        """Writes shards and the umbrella header
+
+        Args:
+            declarations (list of Declaration): exported declarations
+            preamble (str): text which is written at the beginning of the umbrella header
+
+        Returns:
+            written (list of str): paths of shards which were rewritten
+        """
+        redefs = mark_redefinitions(declarations)
+        order, dependencies, merged = self._sort_shards(declarations, redefs)
+
+        shards = {}
+        for declaration, is_redef in zip(declarations, redefs):
+            shard = shards.setdefault(merged[self._get_shard(declaration)], ([], []))
+            shard[0].append(declaration)
+            shard[1].append(is_redef)
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            futures = [executor.submit(self._write_shard, name, *shards[name], dependencies[name])
+                       for name in order]
+            written = [future.result() for future in futures]
+        self._remove_stale_shards(order)
+
+        umbrella = [preamble]
+        header_dir = os.path.dirname(self.header_file)
+        for name in order:
+            include = os.path.relpath(self._get_shard_path(name), header_dir).replace(os.sep, '/')
+            umbrella.append('#include "%s"\n' % include)
+        self._write_if_changed(self.header_file, ''.join(umbrella))
+
+        return [path for path in written if path]
+
+    def _get_shard(self, declaration):
+        """Gets the shard of declaration. It is a directory of the declaration location relative to
+           project directory
+
+        Args:
+            declaration (Declaration): an exported declaration
+
+        Returns:
+            (str): name of the shard
+        """
+        if declaration.location.file is None:
+            return EXTERNAL_SHARD
+
+        filepath = os.path.abspath(declaration.location.file)
+        reldir = os.path.relpath(os.path.dirname(filepath), os.path.abspath(self.project_dir))
+        if reldir == os.curdir:
+            return ROOT_SHARD
+        if reldir == os.pardir or reldir.startswith(os.pardir + os.sep):
+            return EXTERNAL_SHARD
+
+        parts = ['_' + part if part.startswith('_') else part for part in reldir.split(os.sep)]
+        return '/'.join(parts)
+
+    def _get_shard_path(self, name):
+        return os.path.join(self.shards_dir, '%s.h' % name)
+
+    def _sort_shards(self, declarations, redefs):
+        """Sorts shards in dependency order. A shard depends on the shard where a type referenced
+           by its declarations is defined. Shards with cyclic dependencies can't include each other,
+           so they are merged into one shard named after the first of them. Declarations of the merged
+           shard keep the order of the export
+
+        Args:
+            declarations (list of Declaration): exported declarations
+            redefs (list of bool): is declaration a redefinition, for each declaration
+
+        Returns:
+            (tuple): names of shards, dependencies go first, a map of shard names to sorted names
+                of shards they depend on directly and a map of directory shards to shards they are merged into
+        """
+        defined_in = {}
+        for declaration, is_redef in zip(declarations, redefs):
+            if not is_redef:
+                defined_in.setdefault((declaration.kind, declaration.name), self._get_shard(declaration))
+
+        g = nx.DiGraph()
+        for declaration in declarations:
+            shard = self._get_shard(declaration)
+            g.add_node(shard)
+            for ref in declaration.refs:
+                dependency = defined_in.get(ref)
+                if dependency and dependency != shard:
+                    g.add_edge(dependency, shard)
+
+        condensed = nx.condensation(g)
+        names = {n: min(condensed.nodes[n]['members']) for n in condensed.nodes}
+
+        order = list(map(names.get, nx.lexicographical_topological_sort(condensed, key=names.get)))
+        dependencies = {names[n]: sorted(names[p] for p in condensed.predecessors(n)) for n in condensed.nodes}
+        merged = {shard: names[n] for shard, n in condensed.graph['mapping'].items()}
+        return order, dependencies, merged
+
+    def _write_shard(self, name, declarations, redefs, dependencies):
+        """Writes a shard if its content is changed. The shard includes shards it depends on,
+           so it can be included without the umbrella header
+
+        Args:
+            name (str): name of the shard
+            declarations (list of Declaration): declarations of the shard
+            redefs (list of bool): is declaration a redefinition, for each declaration
+            dependencies (list of str): names of shards the shard depends on directly
+
+        Returns:
+            (str): path of the shard if it was rewritten, otherwise None
+        """
+        path = self._get_shard_path(name)
+        guard = '__DECLEXPORTER_%s_H__' % ''.join(c if c.isalnum() else '_%02X' % ord(c) for c in name.upper())
+
+        includes = []
+        for dependency in dependencies:
+            include = os.path.relpath(self._get_shard_path(dependency), os.path.dirname(path))
+            includes.append('#include "%s"\n' % include.replace(os.sep, '/'))
+
+        content = '#ifndef %s\n#define %s\n%s\n%s\n#endif\n' % (guard, guard, ''.join(includes),
+                                                                format_declarations(declarations, redefs))
+
+        if self._write_if_changed(path, content):
+            return path
+        return None
+
+    def _remove_stale_shards(self, order):
+        """Removes shards of previous export which have no declarations now
+
+        Args:
+            order (list of str): names of current shards
+        """
+        current = {os.path.abspath(self._get_shard_path(name)) for name in order}
+        for root, _, files in os.walk(self.shards_dir):
+            for name in files:
+                path = os.path.abspath(os.path.join(root, name))
+                if name.endswith('.h') and path not in current:
+                    os.remove(path)
+
+    @staticmethod
+    def _write_if_changed(path, content):
+        """Writes content to the file if it differs from the current content
+
+        Args:
+            path (str): a path of the file
+            content (str): content of the file
+
+        Returns:
+            (bool): was the file written
+        """
+        if os.path.exists(path):
+            with open(path) as f:
+                if f.read() == content:
+                    return False
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+
+        with open(path, 'w') as f:
+            f.write(content)
+        return True
@@ -1,6 +1,13 @@
 import re
 from clang.cindex import CursorKind
 
+TYPE_KINDS = {
+    CursorKind.STRUCT_DECL: 'struct',
+    CursorKind.UNION_DECL: 'union',
+    CursorKind.ENUM_DECL: 'enum',
+    CursorKind.TYPEDEF_DECL: 'typedef',
+}
+
 
 class Parser:
     """Parser of declarations. Just set of methods
@@ -152,6 +159,32 @@ class Parser:
 
         return typedef_name, typedef_src
 
+    @staticmethod
+    def get_type_refs(element):
+        """Gets types that are referenced by a declaration (in fields, typedefs and etc)
+
+        Args:
+            element (clang.cindex.Cursor): a parsed declaration
+
+        Returns:
+            (list of tuple): sorted kinds and names of referenced types
+        """
+        own = (TYPE_KINDS.get(element.kind), element.spelling)
+        refs = set()
+        for cursor in element.walk_preorder():
+            if cursor.kind != CursorKind.TYPE_REF:
+                continue
+
+            referenced = cursor.referenced
+            if referenced is None or not referenced.spelling:
+                continue
+
+            ref = (TYPE_KINDS.get(referenced.kind), referenced.spelling)
+            if ref[0] and ref != own:
+                refs.add(ref)
+
+        return sorted(refs)
+
     @staticmethod
     def _parse_field(field):
         """Parses a field
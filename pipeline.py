@@ -0,0 +1,91 @@
+import queue
+import threading
+
+from project_creator import ProjectCreator
+from exporter import Exporter
+
+
+class Pipeline:
+    """Creator of project file and exporter of declarations at once. Files are parsed
+       while the project is still being discovered, the project file is written as a side product
+
+    Attributes:
+        project_dir (str): a path to project directory
+        build_system (str): a build system that is used for the project (if is used)
+        scheduler (TUScheduler): a scheduler which parses files in worker processes
+        only (list of str): glob patterns of files and declaration locations which are exported (None - any)
+        exclude (list of str): glob patterns of files and declaration locations which are not exported
+        delta (bool): write added, changed and removed declarations since the previous export
+        split (bool): write one header per source directory and an umbrella header which includes them
+    """
+    def __init__(self, project_dir, build_system, scheduler=None, only=None, exclude=None, delta=False,
+                 split=False):
+        self.project_dir = project_dir
+        self.build_system = build_system
+        self.scheduler = scheduler
+        self.only = only
+        self.exclude = exclude
+        self.delta = delta
+        self.split = split
+
+    def run(self):
+        """Discovers project files, exports their declarations and writes the project file
+        """
+        pc = ProjectCreator(self.project_dir, self.build_system, self.only, self.exclude)
+        config = pc.create_config()
+        ag = pc.create_args_generator()
+        exporter = Exporter(self.project_dir, self.scheduler, config, self.only, self.exclude, self.delta,
+                            self.split)
+
+        tu_queue = queue.Queue()
+        streamed = {}
+        errors = []
+        discoverer = threading.Thread(target=self._discover, args=(ag, exporter, tu_queue, streamed, errors))
+        discoverer.daemon = True
+        discoverer.start()
+
+        results, skipped = exporter.scheduler.run_stream(tu_queue)
+        discoverer.join()
+        if errors:
+            raise errors[0]
+
+        config['FILES'] = pc.filter_files(ag.file_to_args)
+        pc.write_project_file(config)
+
+        # Include directories found after a file was streamed change its arguments, such files are parsed
+        # again, so the result is the same as the export of the written project file
+        stale = [exporter.make_tu(filename, args) for filename, args in config['FILES'].items()
+                 if streamed.get(filename) != args]
+        if stale:
+            print('[+] Re-parsing {} files with final arguments...'.format(len(stale)))
+            for filename, _, _ in stale:
+                results.pop(filename, None)
+                skipped.pop(filename, None)
+            stale_results, stale_skipped = exporter.scheduler.run(stale)
+            results.update(stale_results)
+            skipped.update(stale_skipped)
+
+        exporter.collect(results, skipped)
+        exporter.write_header()
+        exporter.write_fingerprints()
+
+    @staticmethod
+    def _discover(ag, exporter, tu_queue, streamed, errors):
+        """Puts files into the queue as soon as their arguments are known
+
+        Args:
+            ag (BaseArgsGenerator): generator of files with arguments
+            exporter (Exporter): exporter which makes translation units
+            tu_queue (queue.Queue): queue of translation units, None marks the end of them
+            streamed (dict of str:list): a map of put filenames to their arguments (without language flags)
+            errors (list): an exception raised while discovering is appended to the list
+        """
+        try:
+            for filename, args in ag.iter_generate():
+                if exporter.is_selected(filename):
+                    streamed[filename] = args
+                    tu_queue.put(exporter.make_tu(filename, args))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            tu_queue.put(None)
@@ -3,7 +3,7 @@ import os
 from collections import OrderedDict
 import subprocess
 
-from args_generators import MakefileArgsGenerator, SimpleArgsGenerator
+from args_generators import MakefileArgsGenerator, SimpleArgsGenerator, path_matches
 
 PROJECT_PIGAIOS_DIR = '__declexporter__'
 
@@ -14,13 +14,31 @@ class ProjectCreator:
     Attributes:
         project_dir (str): a path to project directory
         build_system (str): a build system that is used for the project (if is used)
+        only (list of str): glob patterns of files which are added to the project file (None - any file)
+        exclude (list of str): glob patterns of files which are not added to the project file
     """
-    def __init__(self, project_dir, build_system):
+    def __init__(self, project_dir, build_system, only=None, exclude=None):
         self.project_dir = project_dir
         self.build_system = build_system
+        self.only = only
+        self.exclude = exclude
 
     def create_project_file(self):
         """Creates a project file
+
+        Returns:
+            config (dict): project configuration of declexporter
+        """
+        config = self.create_config()
+        config['FILES'] = self.filter_files(self.create_args_generator().generate())
+        self.write_project_file(config)
+        return config
+
+    def create_config(self):
+        """Creates project configuration without files
+
+        Returns:
+            config (dict): project configuration of declexporter
         """
         config = OrderedDict()
 
@@ -38,16 +56,48 @@ class ProjectCreator:
         }
         config['PROJECT'] = OrderedDict(sorted((config['PROJECT']).items(), key=lambda x: x[0]))
 
-        # And now add all discovered source files
+        return config
+
+    def create_args_generator(self):
+        """Creates a generator of files with arguments for the build system
+
+        Returns:
+            (BaseArgsGenerator): generator of files with arguments
+        """
         if self.build_system == 'Makefile':
-            ag = MakefileArgsGenerator(self.project_dir)
+            return MakefileArgsGenerator(self.project_dir)
         else:
-            ag = SimpleArgsGenerator(self.project_dir)
+            return SimpleArgsGenerator(self.project_dir)
 
-        file_to_args = ag.generate()
+    def is_selected(self, filename):
+        """Checks if the file is selected by "only" and "exclude" patterns
 
-        config['FILES'] = file_to_args
+        Args:
+            filename (str): a filename from the generator of files with arguments
 
+        Returns:
+            (bool): is file selected
+        """
+        relpath = os.path.relpath(os.path.join(self.project_dir, filename), self.project_dir)
+        return path_matches(relpath, self.only, self.exclude)
+
+    def filter_files(self, file_to_args):
+        """Filters files by "only" and "exclude" patterns
+
+        Args:
+            file_to_args (dict of str:list): a map of filenames to arguments
+
+        Returns:
+            (OrderedDict of str:list): a map of selected filenames to arguments
+        """
+        return OrderedDict((f, args) for f, args in file_to_args.items() if self.is_selected(f))
+
+    def write_project_file(self, config):
+        """Writes project configuration to the project file
+
+        Args:
+            config (dict): project configuration of declexporter
+        """
         project_file = os.path.join(self.project_dir, PROJECT_PIGAIOS_DIR, 'project.json')
         with open(project_file, 'w') as f:
             json.dump(config, f, indent=4)
@@ -0,0 +1,141 @@
+import os
+import re
+
+from args_generators.simple_args_generator import ProjectIncludesExtractor
+
+
+class TypeIndex:
+    """Index of dependencies between types, built from references in fields and typedefs.
+       Types are identified by kind and name, so "struct foo" and "enum foo" are different types
+
+    Attributes:
+        refs (dict of tuple:set): a map of kinds and names of types to types they reference
+    """
+    def __init__(self):
+        self.refs = {}
+        self._names = {}
+
+    def add(self, declaration):
+        """Adds a declaration to the index
+
+        Args:
+            declaration (Declaration): an extracted declaration
+        """
+        key = (declaration.kind, declaration.name)
+        self.refs.setdefault(key, set()).update(declaration.refs)
+        self._names.setdefault(declaration.name, set()).add(key)
+
+    def closure(self, roots):
+        """Gets types that are reachable from the root types. A root type is given by name only,
+           so declarations of any kind with this name are roots
+
+        Args:
+            roots (list of str): names of the root types
+
+        Returns:
+            reachable (set of tuple): kinds and names of the root types and the types they depend on
+                (directly or not)
+        """
+        reachable = set()
+        stack = [key for root in roots for key in self._names.get(root, ())]
+        while stack:
+            key = stack.pop()
+            if key in reachable:
+                continue
+
+            reachable.add(key)
+            stack.extend(self.refs.get(key, ()))
+
+        return reachable
+
+    def missing(self, keys):
+        """Gets types that are not found in the index
+
+        Args:
+            keys (set of tuple): kinds and names of types
+
+        Returns:
+            (set of tuple): kinds and names of types without declarations
+        """
+        return {key for key in keys if key not in self.refs}
+
+    def missing_roots(self, roots):
+        """Gets root types that are not found in the index
+
+        Args:
+            roots (list of str): names of the root types
+
+        Returns:
+            (set of str): names of the root types without declarations
+        """
+        return {root for root in roots if root not in self._names}
+
+
+class SourceScanner:
+    """Textual scanner of a file with its included project headers. It's used to skip files
+       that can't declare any wanted type without parsing them
+
+    Attributes:
+        project_dir (str): a path to project directory
+    """
+    def __init__(self, project_dir):
+        self.project_dir = project_dir
+        self._pie = ProjectIncludesExtractor(project_dir)
+        self._files = {}
+
+    def mentions(self, filepath, args, names):
+        """Checks if the file or headers it includes (directly or not) mention any of names
+
+        Args:
+            filepath (str): an absolute path of the file
+            args (list of str): arguments for clang parsing, -I arguments are used to find headers
+            names (set of str): names of types
+
+        Returns:
+            (bool): are any of names mentioned
+        """
+        if not names:
+            return False
+
+        include_dirs = [arg[2:] for arg in args if arg.startswith('-I')]
+
+        visited = set()
+        stack = [filepath]
+        while stack:
+            path = stack.pop()
+            if path in visited:
+                continue
+            visited.add(path)
+
+            identifiers, includes = self._scan(path)
+            if not identifiers.isdisjoint(names):
+                return True
+
+            for include in includes:
+                for include_dir in [os.path.dirname(path)] + include_dirs:
+                    header = os.path.normpath(os.path.join(self.project_dir, include_dir, include))
+                    if os.path.isfile(header):
+                        stack.append(header)
+                        break
+
+        return False
+
+    def _scan(self, path):
+        """Reads identifiers and includes of the file (results are cached, the text is not kept)
+
+        Args:
+            path (str): an absolute path of the file
+
+        Returns:
+            (tuple): set of identifiers of the file and list of its included files
+        """
+        if path not in self._files:
+            try:
+                with open(path, errors='replace') as f:
+                    identifiers = frozenset(re.findall(r'\w+', f.read()))
+                includes = self._pie.extract_includes(path) or []
+            except (OSError, UnicodeDecodeError):
+                identifiers, includes = frozenset(), []
+            self._files[path] = identifiers, includes
+
+        return self._files[path]
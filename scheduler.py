@@ -0,0 +1,307 @@
+import os
+import time
+import heapq
+import queue
+import itertools
+import multiprocessing
+from multiprocessing.connection import wait
+
+from args_generators.simple_args_generator import ProjectIncludesExtractor
+
+DEFAULT_TU_TIMEOUT = 300
+DEFAULT_TUS_PER_WORKER = 50
+QUEUE_POLL_INTERVAL = 0.05
+RSS_CHECK_INTERVAL = 0.1
+
+
+class TUScheduler:
+    """Scheduler that parses translation units (TU) in a pool of worker processes
+
+    The biggest TUs are dispatched first. A TU that exceeds the wall-clock timeout or the RSS cap
+    is killed together with its worker and recorded as skipped. Workers are recycled after
+    a number of TUs to limit libclang leaks.
+
+    Attributes:
+        parse_func (callable): function (filepath, args) -> list of declarations (it must be set before run)
+        jobs (int): number of worker processes
+        timeout (float): per-TU wall-clock timeout in seconds (None - without timeout)
+        max_rss (int): per-TU RSS cap in bytes (None - without cap)
+        tus_per_worker (int): number of TUs after which a worker is recycled (None - never)
+    """
+    def __init__(self, parse_func=None, jobs=None, timeout=DEFAULT_TU_TIMEOUT, max_rss=None,
+                 tus_per_worker=DEFAULT_TUS_PER_WORKER):
+        self.parse_func = parse_func
+        self.jobs = jobs or os.cpu_count() or 1
+        self.timeout = timeout
+        self.max_rss = max_rss
+        self.tus_per_worker = tus_per_worker
+
+    def run(self, tus):
+        """Parses TUs in worker processes
+
+        Args:
+            tus (list of tuple): TUs as (filename, filepath, args)
+
+        Returns:
+            (tuple): a map of filenames to their declarations and a map of skipped filenames
+                to the reason of skipping
+        """
+        tu_queue = queue.Queue()
+        for tu in tus:
+            tu_queue.put(tu)
+        tu_queue.put(None)
+
+        return self.run_stream(tu_queue)
+
+    def run_stream(self, tu_queue):
+        """Parses TUs in worker processes as soon as they are put into the queue.
+           Among TUs that are waiting for a worker the biggest one is dispatched first
+
+        Args:
+            tu_queue (queue.Queue): TUs as (filename, filepath, args), None marks the end of TUs
+
+        Returns:
+            (tuple): a map of filenames to their declarations and a map of skipped filenames
+                to the reason of skipping
+        """
+        pending = []
+        counter = itertools.count()
+        finished = False
+        results = {}
+        skipped = {}
+        workers = []
+
+        try:
+            while not finished or pending or any(w.task for w in workers):
+                # Block on the queue only when there is nothing else to wait for
+                block = not pending and not any(w.task for w in workers)
+                while not finished:
+                    try:
+                        tu = tu_queue.get(timeout=QUEUE_POLL_INTERVAL) if block else tu_queue.get_nowait()
+                    except queue.Empty:
+                        break
+
+                    block = False
+                    if tu is None:
+                        finished = True
+                    else:
+                        cost = estimate_cost(tu[1])
+                        heapq.heappush(pending, (-cost, next(counter), tu))
+
+                workers = self._recycle(workers)
+                while len(workers) < self.jobs and len(workers) < len(pending) + self._busy(workers):
+                    workers.append(_Worker(self.parse_func, self.tus_per_worker))
+
+                for worker in workers:
+                    if not worker.task and pending:
+                        worker.submit(heapq.heappop(pending)[2])
+
+                busy = [w for w in workers if w.task]
+                if not busy:
+                    continue
+
+                handles = [handle for w in busy for handle in w.wait_handles()]
+                wait(handles, timeout=self._wait_timeout(busy, finished))
+
+                for worker in busy:
+                    self._check_worker(worker, results, skipped)
+        finally:
+            for worker in workers:
+                worker.stop()
+
+        return results, skipped
+
+    def _wait_timeout(self, busy, finished):
+        """Gets how long to wait for busy workers before limits are checked again
+
+        Args:
+            busy (list of _Worker): workers that parse TUs
+            finished (bool): are all TUs already put into the queue
+
+        Returns:
+            (float): timeout in seconds (None - wait until a worker finishes)
+        """
+        timeouts = []
+        if self.timeout is not None:
+            timeouts.append(max(0, min(self.timeout - w.elapsed() for w in busy)))
+        if self.max_rss is not None:
+            timeouts.append(RSS_CHECK_INTERVAL)
+        if not finished and len(busy) < self.jobs:
+            timeouts.append(QUEUE_POLL_INTERVAL)
+
+        return min(timeouts) if timeouts else None
+
+    def _check_worker(self, worker, results, skipped):
+        """Collects a result of the worker or kills it if limits are exceeded
+
+        Args:
+            worker (_Worker): a busy worker
+            results (dict of str:list): a map of filenames to their declarations
+            skipped (dict of str:str): a map of skipped filenames to the reason of skipping
+        """
+        filename = worker.task[0]
+
+        if worker.poll():
+            status, payload = worker.receive()
+            if status == 'ok':
+                results[filename] = payload
+                return
+            reason = payload
+        elif not worker.is_alive():
+            reason = 'worker crashed (exit code %s)' % worker.exitcode
+        elif self.timeout is not None and worker.elapsed() > self.timeout:
+            reason = 'timeout after %s s' % self.timeout
+        elif self.max_rss is not None and (worker.rss() or 0) > self.max_rss:
+            reason = 'RSS exceeds cap %d MB' % (self.max_rss >> 20)
+        else:
+            reason = None
+
+        if reason:
+            worker.kill()
+            skipped[filename] = reason
+            print('[!] Skipped {}: {}'.format(filename, reason))
+
+    @staticmethod
+    def _recycle(workers):
+        """Stops idle workers that are dead or have parsed their number of TUs
+
+        Args:
+            workers (list of _Worker): running workers
+
+        Returns:
+            (list of _Worker): workers that can still be used
+        """
+        alive = []
+        for worker in workers:
+            if worker.task or (worker.is_alive() and not worker.exhausted()):
+                alive.append(worker)
+            else:
+                worker.stop()
+        return alive
+
+    @staticmethod
+    def _busy(workers):
+        return len([w for w in workers if w.task])
+
+
+class _Worker:
+    """A worker process that parses TUs sent through a pipe
+
+    Attributes:
+        task (tuple): a TU the worker is busy with (None if the worker is idle)
+    """
+    def __init__(self, parse_func, max_tasks):
+        self.task = None
+        self._max_tasks = max_tasks
+        self._submitted = 0
+        self._started = None
+        self._conn, child_conn = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(target=_worker_main, args=(child_conn, parse_func, max_tasks))
+        self._process.daemon = True
+        self._process.start()
+        child_conn.close()
+
+    @property
+    def exitcode(self):
+        return self._process.exitcode
+
+    def is_alive(self):
+        return self._process.is_alive()
+
+    def exhausted(self):
+        return self._max_tasks is not None and self._submitted >= self._max_tasks
+
+    def submit(self, tu):
+        self.task = tu
+        self._submitted += 1
+        self._started = time.monotonic()
+        self._conn.send(tu)
+
+    def wait_handles(self):
+        """Gets objects that become ready when the worker sends a result or exits
+
+        Returns:
+            (list): the pipe and the process sentinel
+        """
+        return [self._conn, self._process.sentinel]
+
+    def poll(self):
+        try:
+            return self._conn.poll()
+        except (EOFError, OSError):
+            return False
+
+    def receive(self):
+        self.task = None
+        try:
+            return self._conn.recv()
+        except (EOFError, OSError):
+            self._process.join()
+            return 'error', 'worker crashed (exit code %s)' % self._process.exitcode
+
+    def elapsed(self):
+        return time.monotonic() - self._started
+
+    def rss(self):
+        """Gets resident set size of the worker process
+
+        Returns:
+            (int): RSS in bytes (None if it can't be read)
+        """
+        try:
+            with open('/proc/%d/statm' % self._process.pid) as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def kill(self):
+        self.task = None
+        self.stop()
+
+    def stop(self):
+        if self._process.is_alive():
+            self._process.kill()
+        self._process.join()
+        self._conn.close()
+
+
+def _worker_main(conn, parse_func, max_tasks):
+    """Main loop of a worker process. The worker exits after max_tasks TUs
+
+    Args:
+        conn (multiprocessing.connection.Connection): a pipe to the scheduler
+        parse_func (callable): function (filepath, args) -> list of declarations
+        max_tasks (int): number of TUs after which the worker exits (None - never)
+    """
+    done = 0
+    while max_tasks is None or done < max_tasks:
+        try:
+            _, filepath, args = conn.recv()
+        except EOFError:
+            break
+
+        try:
+            conn.send(('ok', parse_func(filepath, args)))
+        except Exception as e:
+            conn.send(('error', 'parse error: %s' % e))
+        done += 1
+
+    conn.close()
+
+
+def estimate_cost(filepath):
+    """Estimates cost of TU parsing by the file size and the number of its #include statements
+
+    Args:
+        filepath (str): an absolute path of the file
+
+    Returns:
+        (int): estimated cost of parsing
+    """
+    try:
+        size = os.path.getsize(filepath)
+        includes = ProjectIncludesExtractor(os.path.dirname(filepath)).extract_includes(filepath)
+    except (OSError, UnicodeDecodeError):
+        return 0
+
+    return size * (1 + len(includes or []))